@@ -4,17 +4,21 @@ Neovim Version Manager (2025)
 A Python-based manager for installing and switching Neovim versions
 """
 
+import functools
 import json
+import os
 import platform
+import re
 import shutil
 import subprocess
 import sys
 import tarfile
 import tempfile
+import time
 from pathlib import Path
 from typing import Any, Dict
 from typing import List as ListType
-from typing import Tuple
+from typing import Optional, Tuple
 from urllib.error import HTTPError, URLError
 from urllib.request import Request, urlopen
 
@@ -25,17 +29,24 @@ BIN_DIR = Path.home() / ".local" / "bin"
 LINK_PATH = BIN_DIR / "nvim"
 KEEP_VERSIONS = 2
 DRY_RUN = False
+CACHE_DIR = Path.home() / ".cache" / "bob"
+RELEASES_CACHE = CACHE_DIR / "releases.json"
+RELEASES_ETAG = CACHE_DIR / "releases.etag"
+CACHE_TTL = 300  # seconds
 
 
 # === COLORS ===
+_TTY = sys.stdout.isatty()
+
+
 class Colors:  # pylint: disable=too-few-public-methods
     """ANSI color codes for terminal output"""
 
-    GREEN = "\033[32m" if sys.stdout.isatty() else ""
-    YELLOW = "\033[33m" if sys.stdout.isatty() else ""
-    RED = "\033[31m" if sys.stdout.isatty() else ""
-    BOLD = "\033[1m" if sys.stdout.isatty() else ""
-    RESET = "\033[0m" if sys.stdout.isatty() else ""
+    GREEN = "\033[32m" if _TTY else ""
+    YELLOW = "\033[33m" if _TTY else ""
+    RED = "\033[31m" if _TTY else ""
+    BOLD = "\033[1m" if _TTY else ""
+    RESET = "\033[0m" if _TTY else ""
 
 
 def msg(color: str, text: str) -> None:
@@ -50,19 +61,27 @@ def die(text: str) -> None:
 
 
 # === NETWORK UTILITIES ===
-def fetch_json(url: str, timeout: int = 10) -> Dict[str, Any]:
-    """Fetch and parse JSON from URL with error handling"""
+def fetch_json(url: str, timeout: int = 10, etag: str = "") -> Dict[str, Any]:
+    """Fetch and parse JSON from URL with error handling
+
+    When etag is given the request is conditional, and an unchanged
+    resource yields {"not_modified": True} instead of a body.
+    """
     req = Request(url, headers={"User-Agent": "bob.py/1.0"})
+    if etag:
+        req.add_header("If-None-Match", etag)
     try:
         with urlopen(req, timeout=timeout) as response:
             data = json.loads(response.read().decode("utf-8"))
             if isinstance(data, list):
-                return {"releases": data}
+                return {"releases": data, "etag": response.headers.get("ETag", "")}
             if isinstance(data, dict):
                 return data
             die("Invalid JSON response")
             return {}  # Unreachable but satisfies type checker
     except HTTPError as e:
+        if e.code == 304 and etag:
+            return {"not_modified": True}
         die(f"HTTP error {e.code}: {e.reason}")
         return {}  # Unreachable but satisfies type checker
     except URLError as e:
@@ -73,26 +92,42 @@ def fetch_json(url: str, timeout: int = 10) -> Dict[str, Any]:
         return {}  # Unreachable but satisfies type checker
 
 
+class ProgressReader:
+    """Wrap a response, printing download progress as it is read"""
+
+    def __init__(self, raw: Any, total: int) -> None:
+        self.raw = raw
+        self.total = total
+        self.done = 0
+        self.last_print = 0.0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self.raw.read(size)
+        if not chunk:
+            return chunk
+        self.done += len(chunk)
+
+        # Redraw at most ~20 times a second
+        now = time.monotonic()
+        if now - self.last_print > 0.05 or self.done == self.total:
+            self.last_print = now
+            percent = (self.done / self.total) * 100
+            print(f"\r⬇️  Downloading: {percent:.1f}%", end="", flush=True)
+        return chunk
+
+
 def download_file(url: str, dest: Path, progress: bool = True) -> None:
     """Download file with progress indication"""
     try:
         req = Request(url, headers={"User-Agent": "bob.py/1.0"})
         with urlopen(req, timeout=30) as response:
             total_size = int(response.headers.get("content-length", 0))
-            block_size = 8192
-            downloaded = 0
+            source = response
+            if progress and total_size > 0:
+                source = ProgressReader(response, total_size)
 
             with open(dest, "wb") as f:
-                while True:
-                    chunk = response.read(block_size)
-                    if not chunk:
-                        break
-                    f.write(chunk)
-                    downloaded += len(chunk)
-
-                    if progress and total_size > 0:
-                        percent = (downloaded / total_size) * 100
-                        print(f"\r⬇️  Downloading: {percent:.1f}%", end="", flush=True)
+                shutil.copyfileobj(source, f, length=1 << 20)
 
             if progress:
                 print()  # New line after progress
@@ -101,6 +136,30 @@ def download_file(url: str, dest: Path, progress: bool = True) -> None:
         die(f"Download failed: {e}")
 
 
+def download_and_extract(url: str, dest: Path) -> None:
+    """Stream a .tar.gz download straight into dest with progress"""
+    # Reject absolute paths and links escaping dest where tarfile supports it
+    extract_args: Dict[str, Any] = (
+        {"filter": "data"} if hasattr(tarfile, "data_filter") else {}
+    )
+    try:
+        req = Request(url, headers={"User-Agent": "bob.py/1.0"})
+        with urlopen(req, timeout=30) as response:
+            total_size = int(response.headers.get("content-length", 0))
+            source = ProgressReader(response, total_size) if total_size else response
+            try:
+                # "r|gz" reads the archive sequentially from the socket
+                with tarfile.open(fileobj=source, mode="r|gz") as tar:
+                    tar.extractall(dest, **extract_args)
+            finally:
+                if total_size:
+                    print()  # New line after progress, even on failure
+    except (HTTPError, URLError) as e:
+        die(f"Download failed: {e}")
+    except (tarfile.TarError, OSError) as e:
+        die(f"Extraction failed: {e}")
+
+
 # === OS + ARCH DETECTION ===
 def get_os_arch() -> Tuple[str, str]:
     """Detect OS and architecture"""
@@ -124,11 +183,37 @@ def get_os_arch() -> Tuple[str, str]:
     return os_name, arch
 
 
-# === FETCH RELEASE TAG ===
-def fetch_tag(channel: str = "stable") -> str:
-    """Fetch latest release tag for given channel"""
+# === FETCH RELEASES ===
+@functools.lru_cache(maxsize=1)
+def fetch_releases() -> ListType[Dict[str, Any]]:
+    """Fetch the GitHub releases list, reusing a recent on-disk copy"""
+    cached = None
+    try:
+        cached = json.loads(RELEASES_CACHE.read_text(encoding="utf-8"))
+        if not isinstance(cached, list):
+            cached = None
+        elif time.time() - RELEASES_CACHE.stat().st_mtime < CACHE_TTL:
+            return cached
+    except (OSError, json.JSONDecodeError):
+        cached = None
+
+    # Revalidate a stale copy instead of downloading it again
+    etag = ""
+    if cached is not None:
+        try:
+            etag = RELEASES_ETAG.read_text(encoding="utf-8").strip()
+        except OSError:
+            pass
+
     api_url = f"https://api.github.com/repos/{REPO}/releases"
-    response = fetch_json(api_url)
+    response = fetch_json(api_url, etag=etag)
+
+    if cached is not None and response.get("not_modified"):
+        try:
+            RELEASES_CACHE.touch()  # Restart the TTL
+        except OSError:
+            pass
+        return cached
 
     # Handle the response properly - it should be a list or dict with "releases" key
     if isinstance(response, list):
@@ -136,6 +221,21 @@ def fetch_tag(channel: str = "stable") -> str:
     else:
         releases = response.get("releases", [])
 
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        RELEASES_CACHE.write_text(json.dumps(releases), encoding="utf-8")
+        RELEASES_ETAG.write_text(response.get("etag", ""), encoding="utf-8")
+    except OSError:
+        pass
+
+    return releases
+
+
+# === FETCH RELEASE TAG ===
+def fetch_tag(channel: str = "stable") -> str:
+    """Fetch latest release tag for given channel"""
+    releases = fetch_releases()
+
     if channel == "nightly":
         for release in releases:
             if release.get("prerelease", False):
@@ -164,6 +264,35 @@ def construct_download_url(tag: str, os_name: str, arch: str) -> str:
     return ""  # Unreachable but satisfies type checker
 
 
+# === INSTALLED VERSIONS ===
+@functools.lru_cache(maxsize=1)
+def scan_installed() -> Dict[str, "os.DirEntry[str]"]:
+    """Map installed version names to their directory entries"""
+    try:
+        with os.scandir(INSTALL_DIR) as entries:
+            return {entry.name: entry for entry in entries}
+    except FileNotFoundError:
+        return {}
+
+
+def find_installed(tag: str) -> Optional["os.DirEntry[str]"]:
+    """Return the installed entry whose name starts with tag, if any"""
+    return next(
+        (entry for name, entry in scan_installed().items() if name.startswith(tag)),
+        None,
+    )
+
+
+# === ACTIVATION ===
+def link_nvim(nvim_bin: Path) -> None:
+    """Atomically point LINK_PATH at nvim_bin"""
+    tmp_link = LINK_PATH.with_suffix(".new")
+    tmp_link.unlink(missing_ok=True)
+    tmp_link.symlink_to(nvim_bin)
+    # rename(2) swaps the link in one step, so nvim never goes missing
+    os.replace(tmp_link, LINK_PATH)
+
+
 # === INSTALL FUNCTION ===
 def install_nvim(channel: str = "stable", specific: str = "") -> None:
     """Install Neovim version"""
@@ -192,40 +321,51 @@ def install_nvim(channel: str = "stable", specific: str = "") -> None:
         msg(Colors.YELLOW, f"[DRY RUN] Would download: {url}")
         return
 
-    # Download to temp file
-    with tempfile.NamedTemporaryFile(delete=False) as tmp:
-        tmp_path = Path(tmp.name)
-
-    try:
-        download_file(url, tmp_path)
-
-        # Install based on OS
-        if os_name == "darwin":
-            install_path = INSTALL_DIR / tag
-            install_path.mkdir(parents=True, exist_ok=True)
-
-            with tarfile.open(tmp_path, "r:gz") as tar:
-                tar.extractall(install_path)
+    # Install based on OS
+    if os_name == "darwin":
+        # Extract the tarball as it arrives; no temp file round-trip.
+        # Staging it first means a failed download never leaves a
+        # half-populated INSTALL_DIR/<tag> that looks installed. The
+        # staging dir sits next to INSTALL_DIR (same filesystem, so
+        # os.replace works) rather than inside it, so a leftover from a
+        # hard kill is never mistaken for an installed version.
+        install_path = INSTALL_DIR / tag
+        staging = Path(tempfile.mkdtemp(dir=INSTALL_DIR.parent, prefix=f".bob-{tag}."))
+        try:
+            download_and_extract(url, staging)
+            # mkdtemp creates 0700; give the install the usual umask mode
+            umask = os.umask(0)
+            os.umask(umask)
+            staging.chmod(0o777 & ~umask)
+            if install_path.exists():
+                shutil.rmtree(install_path)
+            os.replace(staging, install_path)
+        finally:
+            if staging.exists():
+                shutil.rmtree(staging)
+        nvim_path = install_path / "bin" / "nvim"
+    else:
+        # Download to temp file
+        with tempfile.NamedTemporaryFile(delete=False) as tmp:
+            tmp_path = Path(tmp.name)
 
-            nvim_path = install_path / "bin" / "nvim"
-        else:
+        try:
+            download_file(url, tmp_path)
             nvim_path = INSTALL_DIR / f"{tag}.AppImage"
             shutil.move(str(tmp_path), str(nvim_path))
             nvim_path.chmod(0o755)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
 
-        msg(Colors.GREEN, f"✅ Installed {tag} successfully.")
+    scan_installed.cache_clear()
+    msg(Colors.GREEN, f"✅ Installed {tag} successfully.")
 
-        # Create symlink
-        if LINK_PATH.exists() or LINK_PATH.is_symlink():
-            LINK_PATH.unlink()
-        LINK_PATH.symlink_to(nvim_path)
-        msg(Colors.GREEN, f"🔗 Linked {tag} → {LINK_PATH}")
+    # Create symlink
+    link_nvim(nvim_path)
+    msg(Colors.GREEN, f"🔗 Linked {tag} → {LINK_PATH}")
 
-        autoclean()
-
-    finally:
-        if tmp_path.exists():
-            tmp_path.unlink()
+    autoclean()
 
 
 # === USE FUNCTION ===
@@ -242,17 +382,16 @@ def use_nvim(req: str) -> None:
         tag = req
 
     # Find installed version
-    candidates = list(INSTALL_DIR.glob(f"{tag}*"))
-    if not candidates:
+    target = find_installed(tag)
+    if target is None:
         die(f"Version {tag} not installed. Run 'install {tag}' first.")
+        return  # Unreachable but satisfies type checker
 
-    target = candidates[0]
-    nvim_bin = target / "bin" / "nvim" if target.is_dir() else target
+    target_path = Path(target.path)
+    nvim_bin = target_path / "bin" / "nvim" if target.is_dir() else target_path
 
     BIN_DIR.mkdir(parents=True, exist_ok=True)
-    if LINK_PATH.exists() or LINK_PATH.is_symlink():
-        LINK_PATH.unlink()
-    LINK_PATH.symlink_to(nvim_bin)
+    link_nvim(nvim_bin)
 
     msg(Colors.GREEN, f"✅ Using {tag}")
 
@@ -291,26 +430,29 @@ def uninstall_nvim(tag: str = "") -> None:
 
         if INSTALL_DIR.exists():
             shutil.rmtree(INSTALL_DIR)
+        scan_installed.cache_clear()
         if LINK_PATH.exists() or LINK_PATH.is_symlink():
             LINK_PATH.unlink()
         msg(Colors.GREEN, "✅ All versions removed.")
         return
 
     # Find and remove specific version
-    candidates = list(INSTALL_DIR.glob(f"{tag}*"))
-    if not candidates:
+    target = find_installed(tag)
+    if target is None:
         die(f"Version '{tag}' not found in {INSTALL_DIR}")
+        return  # Unreachable but satisfies type checker
 
-    target = candidates[0]
-    if target.is_dir():
-        shutil.rmtree(target)
+    target_path = Path(target.path)
+    if target.is_dir(follow_symlinks=False):
+        shutil.rmtree(target_path)
     else:
-        target.unlink()
+        target_path.unlink()
+    scan_installed.cache_clear()
 
     # Remove symlink if it points to removed version
     if LINK_PATH.is_symlink():
         try:
-            if LINK_PATH.resolve() == target.resolve():
+            if LINK_PATH.resolve() == target_path.resolve():
                 LINK_PATH.unlink()
         except (OSError, RuntimeError):
             pass
@@ -319,25 +461,40 @@ def uninstall_nvim(tag: str = "") -> None:
 
 
 # === AUTO-CLEAN FUNCTION ===
+def version_key(name: str) -> Tuple[Tuple[int, ...], str]:
+    """Sort key ordering release tags numerically, nightly builds newest"""
+    match = re.match(r"v?(\d+(?:\.\d+)*)", name)
+    if not match:
+        return ((sys.maxsize,), name)
+    return (tuple(int(part) for part in match.group(1).split(".")), name)
+
+
 def autoclean() -> None:
     """Remove old versions, keeping only KEEP_VERSIONS most recent"""
     if not INSTALL_DIR.exists():
         return
 
     versions = sorted(
-        INSTALL_DIR.iterdir(), key=lambda p: p.stat().st_mtime, reverse=True
+        scan_installed().values(), key=lambda e: version_key(e.name), reverse=True
     )
 
     if len(versions) <= KEEP_VERSIONS:
         return
 
+    # Never remove the version the nvim link currently points into
+    active = LINK_PATH.resolve() if LINK_PATH.is_symlink() else None
+
     msg(Colors.YELLOW, f"🧹 Cleaning old versions (keeping {KEEP_VERSIONS})...")
     for old_version in versions[KEEP_VERSIONS:]:
-        if old_version.is_dir():
-            shutil.rmtree(old_version)
+        old_path = Path(old_version.path).resolve()
+        if active and (active == old_path or old_path in active.parents):
+            continue
+        if old_version.is_dir(follow_symlinks=False):
+            shutil.rmtree(old_version.path)
         else:
-            old_version.unlink()
+            os.unlink(old_version.path)
         msg(Colors.RED, f"🗑️  Removed old version: {old_version.name}")
+    scan_installed.cache_clear()
 
 
 # === CHECK CURRENT ===
@@ -395,16 +552,11 @@ def update_nvim(channel: str = "stable") -> None:
         latest_tag = fetch_tag("stable")
 
     # Check if already installed
-    if INSTALL_DIR.exists():
-        installed = [item.name for item in INSTALL_DIR.iterdir()]
-        # Check if this version already exists
-        already_installed = any(latest_tag in name for name in installed)
-
-        if already_installed:
-            msg(Colors.GREEN, f"✅ Already on latest {channel} version: {latest_tag}")
-            # Still switch to it in case we're on a different version
-            use_nvim(latest_tag)
-            return
+    if find_installed(latest_tag) is not None:
+        msg(Colors.GREEN, f"✅ Already on latest {channel} version: {latest_tag}")
+        # Still switch to it in case we're on a different version
+        use_nvim(latest_tag)
+        return
 
     msg(Colors.YELLOW, f"📦 New version available: {latest_tag}")
     install_nvim(channel)
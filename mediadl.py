@@ -19,10 +19,13 @@ from __future__ import annotations
 import argparse
 import json
 import logging
+import os
 import shutil
 import signal
+import stat
 import subprocess
 import sys
+import tempfile
 import threading
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -77,6 +80,35 @@ class ConfigError(RuntimeError):
     """Invalid configuration."""
 
 
+# ────────────────────────────── Helpers ──────────────────────────────
+
+
+def atomic_write_json(path: Path, data: Any) -> None:
+    """Write JSON to path via an fsynced temp file and an atomic rename."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates 0600; keep the existing mode, or the umask default
+        try:
+            mode = stat.S_IMODE(path.stat().st_mode)
+        except FileNotFoundError:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+
 # ────────────────────────────── Data Models ──────────────────────────────
 
 
@@ -145,16 +177,10 @@ class Config:
 
     def save(self) -> None:
         """Save configuration to disk."""
-        CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-        with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-            json.dump(
-                {
-                    k: str(v) if isinstance(v, Path) else v
-                    for k, v in self.__dict__.items()
-                },
-                f,
-                indent=2,
-            )
+        atomic_write_json(
+            CONFIG_FILE,
+            {k: str(v) if isinstance(v, Path) else v for k, v in self.__dict__.items()},
+        )
 
 
 @dataclass
@@ -217,8 +243,7 @@ class MediaDownloader:
             except (json.JSONDecodeError, OSError):
                 logger.warning("Could not read %s, starting fresh", METADATA_DB)
         history.append(record.__dict__)
-        with open(METADATA_DB, "w", encoding="utf-8") as f:
-            json.dump(history, f, indent=2)
+        atomic_write_json(METADATA_DB, history)
 
     @staticmethod
     def _ensure_tool(name: str) -> None: